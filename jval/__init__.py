@@ -1,5 +1,6 @@
 """
-Import the validate function from the main module.
+Import the validate functions from the main module.
 """
 
-from .__main__ import validate
+from .__main__ import compile_validator, validate, validate_many
+from .errors import ValidationError
@@ -3,17 +3,156 @@ JVAL - JSON Validation Library
 """
 
 import argparse
+import copy
 import json
 import sys
+import threading
 import urllib.parse
-from typing import Any, Dict, List, Union
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 import traceback
 
-from .validation import _validate, raise_if_invalid_json
+from .errors import ValidationError
+from .validation import (
+    _validate,
+    compile_schema,
+    raise_if_invalid_json,
+    warn_multiple_object_schemas,
+)
+
+# Use orjson to parse input files when it is installed, it is much faster than
+# the json module on large files
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 JsonDict = Dict[str, Union[int, float, str, bool, None, "JsonDict", "JsonList"]]
 JsonList = List[Union[int, float, str, bool, None, "JsonDict", "JsonList"]]
 
+# Compiled validators, keyed by the identity of the schema they were built from.
+# Each entry keeps the schema alive (so its id cannot be reused) and a deep copy
+# of it, used to detect schemas that were modified after being compiled.
+# Schema dicts cannot be weakly referenced, so instead of expiring entries when
+# a schema is dropped, only the most recently used schemas are kept.
+# Comparing a schema with its copy walks the whole schema on every call to
+# validate, which compile_validator avoids by checking the schema only once.
+COMPILED_SCHEMAS_MAX_SIZE = 128
+_COMPILED_SCHEMAS: "OrderedDict[int, Tuple[JsonDict, JsonDict, Callable]]" = (
+    OrderedDict()
+)
+_COMPILED_SCHEMAS_LOCK = threading.Lock()
+
+# Compiled validators cannot be pickled, so each worker process of validate_many
+# receives the schema once and compiles its own validator
+_WORKER_STATE: Dict[str, Any] = {}
+
+
+def _get_validator(jval_schema: JsonDict) -> Optional[Callable[..., Any]]:
+    """
+    Get the compiled validator for a JVAL schema, compiling it if needed.
+
+    Args:
+        jval_schema (Dict[str, Any]):
+            JVAL schema to get the validator for.
+
+    Returns:
+        Compiled validator, or None if the schema cannot be compiled.
+    """
+    with _COMPILED_SCHEMAS_LOCK:
+        cached = _COMPILED_SCHEMAS.get(id(jval_schema))
+        if cached is not None:
+            _COMPILED_SCHEMAS.move_to_end(id(jval_schema))
+
+    # Values that fail to compare are taken for a modified schema
+    try:
+        if cached is not None and _is_same_schema(cached[1], jval_schema):
+            return cached[2]
+    except Exception:  # pylint: disable=broad-except
+        pass
+
+    # Warn outside of the compilation, so that warnings turned into errors are
+    # raised to the caller instead of being taken for a malformed schema
+    warn_multiple_object_schemas(jval_schema, stacklevel=3)
+
+    # Malformed schemas are left to the slow path, which reports them
+    try:
+        validator = compile_schema(jval_schema)
+    except Exception:  # pylint: disable=broad-except
+        return None
+
+    # Schemas that cannot be copied, such as those nested too deeply, are used
+    # without caching them
+    try:
+        snapshot = _take_snapshot(jval_schema)
+    except Exception:  # pylint: disable=broad-except
+        return validator
+
+    with _COMPILED_SCHEMAS_LOCK:
+        _COMPILED_SCHEMAS[id(jval_schema)] = (jval_schema, snapshot, validator)
+        _COMPILED_SCHEMAS.move_to_end(id(jval_schema))
+        if len(_COMPILED_SCHEMAS) > COMPILED_SCHEMAS_MAX_SIZE:
+            _COMPILED_SCHEMAS.popitem(last=False)
+    return validator
+
+
+def _take_snapshot(jval_schema: JsonDict) -> Tuple[JsonDict, List[Tuple]]:
+    """
+    Take a snapshot of a JVAL schema, to detect whether it is modified later.
+
+    Args:
+        jval_schema (Dict[str, Any]):
+            JVAL schema to take the snapshot of.
+
+    Returns:
+        Deep copy of the schema, and the location and type of every number in it.
+    """
+    number_types = []
+    stack = [(jval_schema, ())]
+    while stack:
+        node, path = stack.pop()
+        if isinstance(node, dict):
+            stack.extend((value, (*path, key)) for key, value in node.items())
+        elif isinstance(node, list):
+            stack.extend((value, (*path, index)) for index, value in enumerate(node))
+        elif isinstance(node, (int, float)):
+            number_types.append((path, type(node)))
+    return copy.deepcopy(jval_schema), number_types
+
+
+def _is_same_schema(snapshot: Tuple[JsonDict, List[Tuple]], jval_schema: JsonDict):
+    """
+    Check whether a JVAL schema still matches a snapshot taken with
+    `_take_snapshot`.
+
+    `==` compares containers in C, sharing the identity shortcut that makes NaN
+    match itself, but it takes `1`, `1.0` and `True` for the same value, while
+    they define different types in a schema. Numbers are compared by type too.
+
+    Args:
+        snapshot (Tuple[Dict[str, Any], List[Tuple]]):
+            Snapshot of the schema taken when it was compiled.
+        jval_schema (Dict[str, Any]):
+            JVAL schema to compare with the snapshot.
+
+    Returns:
+        Whether the schema is unchanged.
+    """
+    schema_copy, number_types = snapshot
+    if schema_copy != jval_schema:
+        return False
+
+    # The schema is equal to its copy, so every number is still where it was
+    for path, number_type in number_types:
+        node = jval_schema
+        for segment in path:
+            node = node[segment]
+        if type(node) is not number_type:  # pylint: disable=unidiomatic-typecheck
+            return False
+    return True
+
 
 def validate(
     json_dict: JsonDict,
@@ -33,10 +172,156 @@ def validate(
             Drop extra keys in the JSON data that are not defined in the JVAL schema.
             Defaults to False.
 
+    Returns:
+        Validated JSON data.
+    """
+    return _run_validator(
+        _get_validator(jval_schema),
+        json_dict,
+        jval_schema,
+        drop_extra_keys=drop_extra_keys,
+    )
+
+
+def compile_validator(jval_schema: JsonDict) -> Callable[..., Any]:
+    """
+    Compile a JVAL schema once, to validate many JSON documents against it.
+
+    Unlike `validate`, the returned function does not check on every call
+    whether the schema was modified, so the schema must not be modified while
+    the function is in use.
+
+    Args:
+        jval_schema (Dict[str, Any]):
+            JVAL schema to validate against.
+
+    Returns:
+        Function that takes the JSON data to validate and an optional
+        `drop_extra_keys` keyword argument, and behaves like `validate`.
+    """
+    validator = _get_validator(jval_schema)
+
+    def validate_compiled(json_dict: JsonDict, *, drop_extra_keys: bool = False) -> Any:
+        return _run_validator(
+            validator, json_dict, jval_schema, drop_extra_keys=drop_extra_keys
+        )
+
+    return validate_compiled
+
+
+def validate_many(
+    json_dicts: Iterable[JsonDict],
+    jval_schema: JsonDict,
+    *,
+    drop_extra_keys: bool = False,
+    workers: Optional[int] = None,
+) -> List[Any]:
+    """
+    Validate several JSON documents against the same JVAL schema.
+
+    Args:
+        json_dicts (Iterable[Any]):
+            JSON documents to validate.
+        jval_schema (Dict[str, Any]):
+            JVAL schema to validate against.
+        drop_extra_keys (bool, optional):
+            Drop extra keys in the JSON data that are not defined in the JVAL schema.
+            Defaults to False.
+        workers (int, optional):
+            Number of processes to validate the documents in. Defaults to None,
+            which validates them in the current process.
+
+    Returns:
+        Validated JSON documents, in the same order as the input.
+    """
+    # Validate the documents in parallel, keeping the first error in input order
+    if workers is not None and workers > 1:
+        warn_multiple_object_schemas(jval_schema, stacklevel=2)
+        try:
+            with ProcessPoolExecutor(
+                workers,
+                initializer=_init_worker,
+                initargs=(jval_schema, drop_extra_keys),
+            ) as executor:
+                return list(executor.map(_validate_in_worker, json_dicts, chunksize=64))
+        except ValueError as exc:
+            raise exc.with_traceback(None) from None
+
+    validator = _get_validator(jval_schema)
+    return [
+        _run_validator(
+            validator, json_dict, jval_schema, drop_extra_keys=drop_extra_keys
+        )
+        for json_dict in json_dicts
+    ]
+
+
+def _init_worker(jval_schema: JsonDict, drop_extra_keys: bool):
+    """
+    Compile the JVAL schema in a worker process of validate_many.
+
+    Args:
+        jval_schema (Dict[str, Any]):
+            JVAL schema to validate against.
+        drop_extra_keys (bool):
+            Drop extra keys in the JSON data that are not defined in the JVAL schema.
+    """
+    _WORKER_STATE["jval_schema"] = jval_schema
+
+    # The schema was already checked for warnings by the parent process
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        _WORKER_STATE["validator"] = _get_validator(jval_schema)
+    _WORKER_STATE["drop_extra_keys"] = drop_extra_keys
+
+
+def _validate_in_worker(json_dict: JsonDict) -> Any:
+    """
+    Validate a JSON document in a worker process of validate_many.
+
+    Args:
+        json_dict (Any):
+            JSON data to validate.
+
+    Returns:
+        Validated JSON data.
+    """
+    return _run_validator(
+        _WORKER_STATE["validator"],
+        json_dict,
+        _WORKER_STATE["jval_schema"],
+        drop_extra_keys=_WORKER_STATE["drop_extra_keys"],
+    )
+
+
+def _run_validator(
+    validator: Optional[Callable[..., Any]],
+    json_dict: JsonDict,
+    jval_schema: JsonDict,
+    *,
+    drop_extra_keys: bool = False,
+) -> Any:
+    """
+    Validate JSON data, turning unexpected errors into readable ones.
+
+    Args:
+        validator (Callable, optional):
+            Compiled validator for the JVAL schema, or None to use the slow path.
+        json_dict (Any):
+            JSON data to validate.
+        jval_schema (Dict[str, Any]):
+            JVAL schema to validate against.
+        drop_extra_keys (bool, optional):
+            Drop extra keys in the JSON data that are not defined in the JVAL schema.
+            Defaults to False.
+
     Returns:
         Validated JSON data.
     """
     try:
+        if validator is not None:
+            return validator(json_dict, drop_extra_keys=drop_extra_keys)
+
         return _validate(
             json_dict,
             jval_schema,
@@ -45,9 +330,9 @@ def validate(
 
     except Exception as exc:
 
-        # If e was a value error and starts with validation error, raise it
-        if exc.__class__ == ValueError and str(exc).startswith("Validation error"):
-            raise ValueError(str(exc)) from None
+        # If e was raised by the validator itself, raise it as it is
+        if isinstance(exc, ValidationError):
+            raise exc.with_traceback(None) from None
 
         # If any of the JSON objects are invalid, raise an error
         try:
@@ -77,6 +362,44 @@ def validate(
         raise ValueError(text) from None
 
 
+def _validate_ndjson(
+    ndjson: bytes, jval_schema: JsonDict, *, drop_extra_keys: bool = False
+) -> List[Any]:
+    """
+    Validate a JSON document per line against a JVAL schema.
+
+    Args:
+        ndjson (bytes):
+            JSON documents to validate, one per line. Blank lines are skipped.
+        jval_schema (Dict[str, Any]):
+            JVAL schema to validate against.
+        drop_extra_keys (bool, optional):
+            Drop extra keys in the JSON data that are not defined in the JVAL schema.
+            Defaults to False.
+
+    Returns:
+        Validated JSON documents, in the same order as the lines.
+    """
+    validate_line = compile_validator(jval_schema)
+    validated_data = []
+
+    # Errors are prefixed by the line number, to find the document that failed
+    for line_number, line in enumerate(ndjson.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            json_data = json_loads(line)
+        except ValueError as e:
+            raise ValueError(f"Line {line_number}: Error decoding JSON: {e}") from None
+        try:
+            validated_data.append(
+                validate_line(json_data, drop_extra_keys=drop_extra_keys)
+            )
+        except ValueError as e:
+            raise ValueError(f"Line {line_number}: {e}") from None
+    return validated_data
+
+
 def main():
     """
     Command-line interface for the JVAL validator.
@@ -86,12 +409,12 @@ def main():
     )
     parser.add_argument(
         "json_path",
-        type=argparse.FileType("r"),
-        help="Path to the JSON file to validate",
+        type=argparse.FileType("rb"),
+        help="Path to the JSON file to validate, or - to read from stdin",
     )
     parser.add_argument(
         "jval_path",
-        type=argparse.FileType("r"),
+        type=argparse.FileType("rb"),
         help="Path to the JVAL schema file",
     )
     parser.add_argument(
@@ -99,20 +422,34 @@ def main():
         action="store_true",
         help="Drop extra keys in the JSON data that are not defined in the JVAL schema",
     )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Read one JSON document per line (NDJSON) and print one per line",
+    )
     args = parser.parse_args()
 
     try:
-        json_data = json.load(args.json_file)
-        jval_schema = json.load(args.jval_file)
-    except json.JSONDecodeError as e:
+        with args.json_path as json_file, args.jval_path as jval_file:
+            json_data = json_file.read()
+            if not args.batch:
+                json_data = json_loads(json_data)
+            jval_schema = json_loads(jval_file.read())
+    except ValueError as e:
         print(f"Error decoding JSON: {e}", file=sys.stderr)
         sys.exit(1)
 
     try:
-        validated_data = validate(
-            json_data, jval_schema, drop_extra_keys=args.drop_extra_keys
-        )
-        print(json.dumps(validated_data, indent=2))
+        if args.batch:
+            for validated_data in _validate_ndjson(
+                json_data, jval_schema, drop_extra_keys=args.drop_extra_keys
+            ):
+                print(json.dumps(validated_data))
+        else:
+            validated_data = validate(
+                json_data, jval_schema, drop_extra_keys=args.drop_extra_keys
+            )
+            print(json.dumps(validated_data, indent=2))
         sys.exit(0)
     # pylint: disable=broad-except
     except Exception as e:
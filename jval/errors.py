@@ -2,22 +2,56 @@
 This module contains the error handling functions for the jval package.
 """
 
-def raise_error(key, message, context):
+
+class ValidationError(ValueError):
     """
-    Raise a validation error.
+    Error raised when the JSON data does not match the JVAL schema.
+
+    Its only argument is the formatted message, as for the ValueError it used
+    to be, while the pieces of the message are kept as attributes.
 
     Args:
         key (str):
             Key that caused the validation error.
         message (str):
             Error message.
-        context (str):
-            Context of the validation error.
+        context (Tuple[Union[str, int], ...]):
+            Keys and list indices leading to the validation error.
+    """
+
+    def __init__(self, key, message, context):
+        location = format_context(context)
+        if location.strip():
+            return_str = f"Validation error at '{location}': "
+        else:
+            return_str = "Validation error at root: "
+        return_str += f"{message} for key '{key}'"
+
+        super().__init__(return_str)
+        self.key = key
+        self.message = message
+        self.context = context
+
+    def __reduce__(self):
+        # Rebuild from the pieces of the message, for validate_many workers
+        return type(self), (self.key, self.message, self.context)
+
+
+def format_context(context):
+    """
+    Format the location of a validation error, such as "key1.key2[0].key3".
+
+    Args:
+        context (Tuple[Union[str, int], ...]):
+            Keys and list indices leading to the validation error.
+
+    Returns:
+        Formatted location.
     """
-    return_str = ""
-    if context.strip():
-        return_str += f"Validation error at '{context}': "
-    else:
-        return_str += "Validation error at root: "
-    return_str += f"{message} for key '{key}'"
-    raise ValueError(return_str)
+    location = ""
+    for segment in context:
+        if isinstance(segment, int):
+            location += f"[{segment}]"
+        else:
+            location = f"{location}.{segment}" if location else segment
+    return location
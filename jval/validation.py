@@ -2,11 +2,22 @@
 Defines the validation logic for the JVAL schema.
 """
 
-from typing import Any, Dict, Union
+import functools
+import io
+import warnings
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
-from .errors import raise_error
+from .errors import ValidationError
 
-NotPresent = type(None)
+# JSON objects and lists are told apart with `type(x) is dict` / `type(x) is list`
+# in the validators, which is cheaper than isinstance on values of other types
+# pylint: disable=unidiomatic-typecheck
+
+# Sentinel for keys missing from the JSON data, distinct from any JSON value
+_MISSING = object()
+
+# Location of a value in the JSON data, as the keys and list indices leading to it
+Context = Tuple[Union[str, int], ...]
 
 
 SYMBOL_OPTIONAL = "?"
@@ -18,10 +29,33 @@ SYMBOL_TYPE_START = "<"
 SYMBOL_TYPE_END = ">"
 
 
+JSON_LEAF_TYPES = (int, float, str, bool, type(None))
+
+
+KEY_LITERAL = 0
+KEY_TYPED = 1
+KEY_OPTIONAL = 2
+KEY_OPTIONAL_TYPED = 3
+KEY_OPTIONAL_DEFAULT = 4
+
+
+# Schemas nested deeper than this are validated without recursion, since each
+# level of nesting costs a few Python frames in the compiled validators
+MAX_RECURSIVE_DEPTH = 100
+
+
+TYPE_DICT = {
+    f"{SYMBOL_TYPE_START}str{SYMBOL_TYPE_END}": str,
+    f"{SYMBOL_TYPE_START}int{SYMBOL_TYPE_END}": int,
+    f"{SYMBOL_TYPE_START}bool{SYMBOL_TYPE_END}": bool,
+    f"{SYMBOL_TYPE_START}float{SYMBOL_TYPE_END}": float,
+}
+
+
 def _validate(
     json_dict: Any,
     jval_schema: Dict[str, Any],
-    __context: str = "",
+    __context: Context = (),
     *,
     drop_extra_keys: bool = False,
 ) -> Any:
@@ -43,95 +77,137 @@ def _validate(
     validated_data = {}
 
     for schema_key, schema_value in jval_schema.items():
-        clean_key = get_clean_key(schema_key)
-        actual_value = json_dict.get(clean_key, NotPresent)
-        current_context = f"{__context}.{clean_key}" if __context else clean_key
-        schema_value = None if schema_value in ({}, []) else schema_value
-
-        # Recursively validate nested objects
-        if isinstance(actual_value, dict) and isinstance(schema_value, dict):
-            _validate(
-                actual_value,
-                schema_value,
-                current_context,
-                drop_extra_keys=drop_extra_keys,
-            )
-            validated_data[clean_key] = actual_value
-
-        # Recursively validate nested lists
-        elif isinstance(actual_value, list) and isinstance(schema_value, list):
-            _validate_list(
-                schema_key,
-                schema_value,
-                actual_value,
-                current_context,
-                drop_extra_keys=drop_extra_keys,
-            )
-            validated_data[clean_key] = actual_value
+        nested = _validate_key(
+            json_dict, schema_key, schema_value, __context, validated_data
+        )
 
-        # Validate literals, types, and optional values
-        else:
+        # Recursively validate nested objects and lists
+        if nested is not None:
+            _validate_nested(nested, drop_extra_keys)
 
-            # Actual value exists
-            if actual_value is not NotPresent:
+    _validate_extra_keys(json_dict, jval_schema, __context, drop_extra_keys)
+    return validated_data
 
-                # Spec key starts with an asterisk (type definition)
-                if schema_key.startswith(f"{SYMBOL_TYPED}"):
-                    _validate_type(
-                        schema_key,
-                        schema_value,
-                        actual_value,
-                        current_context,
-                    )
 
-                # Spec key starts with a question mark (optional value)
-                elif schema_key.startswith(f"{SYMBOL_OPTIONAL}"):
-                    _validate_optional(
-                        schema_key,
-                        schema_value,
-                        actual_value,
-                        current_context,
-                        drop_extra_keys=drop_extra_keys,
-                    )
+def _validate_key(
+    json_dict: Any,
+    schema_key: str,
+    schema_value: Any,
+    context: Context,
+    validated_data: Dict[str, Any],
+) -> Optional[tuple]:
+    """
+    Validate a single key of an object, except for its nested objects and lists.
 
-                # Spec key is a literal value
-                else:
-                    _validate_literal(
-                        schema_key,
-                        schema_value,
-                        actual_value,
-                        current_context,
-                    )
-                validated_data[clean_key] = actual_value
+    Args:
+        json_dict (Any):
+            JSON object holding the key.
+        schema_key (str):
+            Key in the JVAL schema.
+        schema_value (Any):
+            Value for the key in the JVAL schema.
+        context (Tuple[Union[str, int], ...]):
+            Keys and list indices leading to the JSON object.
+        validated_data (Dict[str, Any]):
+            Validated data of the JSON object, where the value is stored.
+
+    Returns:
+        The nested object or list that is left to validate, as
+        `("dict", json_dict, jval_schema, context)` or
+        `("list", schema_key, schema_values, actual_values, context)`,
+        or None if the key was fully validated.
+    """
+    clean_key = get_clean_key(schema_key)
+    category = _classify_key(schema_key)
+    actual_value = json_dict.get(clean_key, _MISSING)
+    current_context = (*context, clean_key)
+    schema_value = _empty_to_none(schema_value)
+
+    # Actual value does not exist
+    if actual_value is _MISSING:
+
+        # Schema defines a default value
+        if category == KEY_OPTIONAL_DEFAULT:
+            validated_data[clean_key] = schema_value
+
+        # Key is not optional, and schema does not define a default value
+        elif category not in (KEY_OPTIONAL, KEY_OPTIONAL_TYPED):
+            raise ValidationError(clean_key, "missing value", current_context)
+        return None
+
+    validated_data[clean_key] = actual_value
+
+    # Nested objects
+    if type(actual_value) is dict and type(schema_value) is dict:
+        return ("dict", actual_value, schema_value, current_context)
+
+    # Nested lists
+    if type(actual_value) is list and type(schema_value) is list:
+        return ("list", schema_key, schema_value, actual_value, current_context)
+
+    # Spec key starts with an asterisk (type definition), or defines the type
+    # of an optional value
+    if category == KEY_TYPED or (
+        category == KEY_OPTIONAL_TYPED and _is_type_definition(schema_value)
+    ):
+        _validate_type(schema_key, schema_value, actual_value, current_context)
 
-            # Actual value does not exist, but schema defines a default value
-            elif schema_key.startswith(f"{SYMBOL_OPTIONAL}"):
-                if schema_key.startswith(f"{SYMBOL_OPTIONAL}{SYMBOL_DEFAULT}"):
-                    validated_data[clean_key] = schema_value
+    # Type of an optional value is defined as a list
+    elif category == KEY_OPTIONAL_TYPED and type(schema_value) is list:
+        return ("list", schema_key, [schema_value], actual_value, current_context)
 
-            # Actual value does not exist, and schema does not define a default value, raise error
-            else:
-                raise_error(clean_key, "missing value", current_context)
+    # Type of an optional value is defined as a dict
+    elif category == KEY_OPTIONAL_TYPED and type(schema_value) is dict:
+        return ("dict", actual_value, schema_value, current_context)
+
+    # Spec key defines the type of an optional value by its default
+    elif category == KEY_OPTIONAL_DEFAULT:
+        _validate_type(
+            schema_key,
+            f"{SYMBOL_TYPE_START}{type(schema_value).__name__}{SYMBOL_TYPE_END}",
+            actual_value,
+            current_context,
+        )
 
-    # Extract clean keys from the JVAL schema
+    # Spec value is a literal value that does not match
+    elif actual_value != schema_value:
+        _validate_literal(schema_key, schema_value, actual_value, current_context)
+    return None
+
+
+def _validate_extra_keys(
+    json_dict: Any,
+    jval_schema: Dict[str, Any],
+    context: Context,
+    drop_extra_keys: bool,
+):
     schema_keys = {get_clean_key(k) for k in jval_schema}
-    extra_keys = set(json_dict) - schema_keys
 
-    # Handle extra keys in the JSON data
-    for key in extra_keys:
-        if drop_extra_keys:
-            json_dict.pop(key)
-        else:
-            raise_error(key, "extra key not defined in schema", __context)
+    # Values that are not objects are still checked by their elements, as they
+    # were before dict views were used
+    keys = json_dict.keys() if type(json_dict) is dict else set(json_dict)
 
-    return validated_data
+    # Nested objects are part of the validated data, so extra keys are deleted
+    # from them, while the root object is left untouched
+    for key in keys - schema_keys:
+        if not drop_extra_keys:
+            raise ValidationError(key, "extra key not defined in schema", context)
+        if context:
+            del json_dict[key]
+
+
+def _validate_nested(nested: tuple, drop_extra_keys: bool):
+    if nested[0] == "dict":
+        _validate(*nested[1:], drop_extra_keys=drop_extra_keys)
+    else:
+        _validate_list(*nested[1:], drop_extra_keys=drop_extra_keys)
 
 
 def _validate_literal(
-    key: str, schema_value: Any, actual_value: Any, current_context: str
+    key: str, schema_value: Any, actual_value: Any, current_context: Context
 ):
     if actual_value != schema_value:
-        raise_error(
+        raise ValidationError(
             get_clean_key(key), f"expected literal '{schema_value}'", current_context
         )
 
@@ -140,147 +216,608 @@ def _validate_type(
     key: str,
     schema_value: str,
     actual_value: Any,
-    current_context: str,
+    current_context: Context,
 ):
     if not isinstance(schema_value, str):
         return
 
-    type_dict = {
-        f"{SYMBOL_TYPE_START}str{SYMBOL_TYPE_END}": str,
-        f"{SYMBOL_TYPE_START}int{SYMBOL_TYPE_END}": int,
-        f"{SYMBOL_TYPE_START}bool{SYMBOL_TYPE_END}": bool,
-        f"{SYMBOL_TYPE_START}float{SYMBOL_TYPE_END}": float,
-    }
+    # Known types are resolved with a single lookup, anything else is parsed
+    expected_type = TYPE_DICT.get(schema_value)
 
     # Unknown type
-    if schema_value.startswith(f"{SYMBOL_TYPE_START}") and schema_value.endswith(
-        f"{SYMBOL_TYPE_END}"
-    ):
-        if schema_value not in type_dict:
-            raise_error(
-                get_clean_key(key),
-                f"unknown type {schema_value} in schema",
-                current_context,
-            )
+    if expected_type is None and _parse_type(schema_value)[1]:
+        raise ValidationError(
+            get_clean_key(key),
+            f"unknown type {schema_value} in schema",
+            current_context,
+        )
 
     # Check if the actual value is of the expected type
-    expected_type = type_dict[schema_value]
     if not isinstance(actual_value, expected_type):
-        raise_error(
+        raise ValidationError(
             get_clean_key(key), f"expected type {schema_value}", current_context
         )
 
 
-def _validate_optional(
+def _validate_list(
     key: str,
-    schema_value: Any,
-    actual_value: Any,
-    current_context: str,
+    schema_values: list,
+    actual_values: Any,
+    current_context: Context,
     drop_extra_keys: bool = False,
 ):
+    for nested in _list_items(key, schema_values, actual_values, current_context):
+        _validate_nested(nested, drop_extra_keys)
 
-    # Spec defines the type
-    if key.startswith(f"{SYMBOL_OPTIONAL}{SYMBOL_TYPED}"):
 
-        # Type is defined as literal
-        if (
-            isinstance(schema_value, str)
-            and schema_value.startswith(f"{SYMBOL_TYPE_START}")
-            and schema_value.endswith(f"{SYMBOL_TYPE_END}")
-        ):
-            _validate_type(key, schema_value, actual_value, current_context)
-
-        # Type is defined as a list
-        elif isinstance(schema_value, list):
-            _validate_list(
-                key,
-                [schema_value],
-                actual_value,
-                current_context,
-                drop_extra_keys=drop_extra_keys,
-            )
+def _list_items(
+    key: str,
+    schema_values: list,
+    actual_values: Any,
+    current_context: Context,
+) -> List[tuple]:
+    """
+    Validate a list of literals, or get the nested objects or lists in a list.
 
-        # Type is defined as a dict
-        elif isinstance(schema_value, dict):
-            _validate(
-                actual_value,
-                schema_value,
-                current_context,
-                drop_extra_keys=drop_extra_keys,
-            )
+    Returns:
+        Nested objects and lists left to validate, in the order they are
+        validated, in the same format as returned by `_validate_key`.
+    """
+    first = schema_values[0]
+
+    # List of literals, checked by the same code as in compiled schemas
+    if isinstance(first, (str, float, int)):
+        _compile_list(key, schema_values)(actual_values, current_context, False)
+        return []
+
+    # List of dicts
+    # Every element must match every schema, checked one schema at a time
+    if type(first) is dict:
+        return [
+            ("dict", actual_value, schema, (*current_context, index))
+            for schema in schema_values
+            for index, actual_value in enumerate(actual_values)
+        ]
+
+    # List of lists
+    if type(first) is list:
+        return [
+            ("list", key, first, actual_value, (*current_context, index))
+            for index, actual_value in enumerate(actual_values)
+        ]
+    return []
+
+
+def _validate_iter(
+    json_dict: Any,
+    jval_schema: Dict[str, Any],
+    __context: Context = (),
+    *,
+    drop_extra_keys: bool = False,
+) -> Any:
+    """
+    Validate JSON data against the JVAL schema without recursion.
+
+    Behaves like `_validate`, but nested objects and lists are pushed to an
+    explicit stack of pending checks instead of being validated by recursive
+    calls, so deeply nested schemas cannot exceed the recursion limit. Checks
+    are popped in the same order as `_validate` runs them, so the same error is
+    raised first.
+
+    Args:
+        json_dict (Any):
+            JSON data to validate.
+        jval_schema (Dict[str, Any]):
+            JVAL schema to validate against.
+        drop_extra_keys (bool, optional):
+            Drop extra keys in the JSON data that are not defined in the JVAL schema.
+            Defaults to False.
+
+    Returns:
+        Validated JSON data.
+    """
+    validated_data = {}
+    stack = _object_items(json_dict, jval_schema, __context, validated_data)
+
+    while stack:
+        item = stack.pop()
+        kind = item[0]
 
-        # Type defined as a literal value
+        # Single key of an object, which may leave a nested object or list
+        if kind == "key":
+            nested = _validate_key(*item[1:])
+            if nested is not None:
+                stack.append(nested)
+
+        # Nested object, whose validated data is not needed
+        elif kind == "dict":
+            stack.extend(_object_items(*item[1:], {}))
+
+        # Nested list
+        elif kind == "list":
+            stack.extend(reversed(_list_items(*item[1:])))
+
+        # Extra keys of an object, once all of its keys were checked
         else:
-            _validate_literal(key, schema_value, actual_value, current_context)
+            _validate_extra_keys(*item[1:], drop_extra_keys)
 
-    # Spec defines an value type implicitly by having a default value
-    elif key.startswith(f"{SYMBOL_OPTIONAL}{SYMBOL_DEFAULT}"):
-        _validate_type(
-            key,
-            f"{SYMBOL_TYPE_START}{type(schema_value).__name__}{SYMBOL_TYPE_END}",
-            actual_value,
-            current_context,
+    return validated_data
+
+
+def _object_items(
+    json_dict: Any,
+    jval_schema: Dict[str, Any],
+    context: Context,
+    validated_data: Dict[str, Any],
+) -> List[tuple]:
+    # Items are popped from the end, so the extra keys are checked last
+    return [
+        ("extra", json_dict, jval_schema, context),
+        *(
+            ("key", json_dict, schema_key, schema_value, context, validated_data)
+            for schema_key, schema_value in reversed(jval_schema.items())
+        ),
+    ]
+
+
+def compile_schema(jval_schema: Dict[str, Any]) -> Callable[..., Any]:
+    """
+    Compile a JVAL schema into a validator function.
+
+    The schema is walked once and turned into the Python source of a single
+    function that performs every key lookup and check inline, which is then
+    compiled with `compile()`. Validating many objects against the same schema
+    no longer parses the schema keys or dispatches through helpers on every call.
+
+    Args:
+        jval_schema (Dict[str, Any]):
+            JVAL schema to compile.
+
+    Returns:
+        Validator with the same signature and behavior as `_validate`, except
+        that the validated data keeps the key order of the JSON data, followed
+        by any default values that were missing from it.
+    """
+    # Deeply nested schemas are validated without recursion
+    if _schema_depth(jval_schema) > MAX_RECURSIVE_DEPTH:
+        return _iterative_validator(jval_schema)
+
+    namespace = {
+        "_MISSING": _MISSING,
+        "ValidationError": ValidationError,
+        "_validate_type": _validate_type,
+        "_validate": _validate,
+        "_validate_list": _validate_list,
+    }
+    has_defaults = any(_classify_key(k) == KEY_OPTIONAL_DEFAULT for k in jval_schema)
+
+    source = io.StringIO()
+    source.write("def validator(json_dict, __context=(), *, drop_extra_keys=False):\n")
+    if has_defaults:
+        source.write("    defaults = {}\n")
+
+    for index, (schema_key, schema_value) in enumerate(jval_schema.items()):
+        _codegen_key(source, namespace, index, schema_key, schema_value)
+
+    namespace["schema_keys"] = frozenset(get_clean_key(k) for k in jval_schema)
+    # Without extra keys, the JSON data holds exactly the validated keys, so it
+    # is copied as a whole instead of key by key. Nested objects are part of the
+    # validated data of their parent, so extra keys are deleted from them, while
+    # the root object is left untouched and only its valid keys are copied.
+    # Values that are not objects only get this far for schemas without keys,
+    # and are still checked by their elements, as they were before dict views
+    # were used
+    keys = "json_dict.keys()" if jval_schema else "set(json_dict)"
+    source.write(
+        f"    extra_keys = {keys} - schema_keys\n"
+        "    if not extra_keys:\n"
+        "        validated_data = dict(json_dict)\n"
+        "    elif not drop_extra_keys:\n"
+        "        raise ValidationError(next(iter(extra_keys)),"
+        " 'extra key not defined in schema', __context)\n"
+        "    elif __context:\n"
+        "        for key in extra_keys:\n"
+        "            del json_dict[key]\n"
+        "        validated_data = dict(json_dict)\n"
+        "    else:\n"
+        "        validated_data = {key: value for key, value in json_dict.items()"
+        " if key in schema_keys}\n"
+    )
+    if has_defaults:
+        source.write("    validated_data.update(defaults)\n")
+    source.write("    return validated_data\n")
+
+    # pylint: disable=exec-used
+    exec(compile(source.getvalue(), "<jval>", "exec"), namespace)
+    return namespace["validator"]
+
+
+def _iterative_validator(jval_schema: Dict[str, Any]) -> Callable[..., Any]:
+    """
+    Build a validator for a deeply nested schema, backed by `_validate_iter`.
+
+    Args:
+        jval_schema (Dict[str, Any]):
+            JVAL schema to validate against.
+
+    Returns:
+        Validator with the same signature and output as the compiled ones.
+    """
+
+    def validator(json_dict, __context=(), *, drop_extra_keys=False):
+        validated_data = _validate_iter(
+            json_dict, jval_schema, __context, drop_extra_keys=drop_extra_keys
         )
 
-    # Spec defined a literal value
-    else:
-        _validate_literal(key, schema_value, actual_value, current_context)
+        # Follow the key order of the JSON data, like the compiled validators
+        ordered_data = {
+            key: value for key, value in json_dict.items() if key in validated_data
+        }
+        ordered_data.update(validated_data)
+        return ordered_data
 
+    return validator
 
-def _validate_list(
-    key: str,
-    schema_values: list,
-    actual_values: Any,
-    current_context: str,
-    drop_extra_keys: bool = False,
+
+def _codegen_key(
+    source: io.StringIO,
+    namespace: Dict[str, Any],
+    index: int,
+    schema_key: str,
+    schema_value: Any,
 ):
+    """
+    Write the source that validates a single schema key.
+
+    Args:
+        source (io.StringIO):
+            Source of the validator being generated.
+        namespace (Dict[str, Any]):
+            Globals of the validator, where the objects it refers to are stored.
+        index (int):
+            Position of the key in its schema, used to name those objects.
+        schema_key (str):
+            Key in the JVAL schema.
+        schema_value (Any):
+            Value for the key in the JVAL schema.
+    """
+    clean_key = get_clean_key(schema_key)
+    schema_value = _empty_to_none(schema_value)
+    key = repr(clean_key)
+    value = f"value_{index}"
+    namespace[value] = schema_value
+
+    category = _classify_key(schema_key)
+
+    source.write(
+        f"    actual_value = json_dict.get({key}, _MISSING)\n"
+        "    if actual_value is _MISSING:\n"
+    )
+
+    # Actual value does not exist, but schema defines a default value
+    if category == KEY_OPTIONAL_DEFAULT:
+        source.write(f"        defaults[{key}] = {value}\n")
+
+    # Actual value does not exist, and the key is optional
+    elif category in (KEY_OPTIONAL, KEY_OPTIONAL_TYPED):
+        source.write("        pass\n")
+
+    # Actual value does not exist, and schema does not define a default value
+    else:
+        source.write(
+            f"        raise ValidationError({key}, 'missing value',"
+            f" (*__context, {key}))\n"
+        )
+
+    # Recursively validate nested objects
+    if type(schema_value) is dict:
+        namespace[f"validate_{index}"] = compile_schema(schema_value)
+        source.write(
+            "    elif type(actual_value) is dict:\n"
+            f"        validate_{index}(actual_value,"
+            f" (*__context, {key}), drop_extra_keys=drop_extra_keys)\n"
+        )
+
+    # Recursively validate nested lists
+    elif type(schema_value) is list:
+        source.write("    elif type(actual_value) is list:\n")
+        for line in _codegen_list(namespace, index, schema_key, schema_value):
+            source.write(f"        {line}\n")
+
+    # Validate literals, types, and optional values
+    lines = _codegen_value(namespace, index, schema_key, schema_value)
+    if lines:
+        source.write("    else:\n")
+    for line in lines:
+        source.write(f"        {line}\n")
+
+
+def _codegen_value(  # pylint: disable=too-many-return-statements
+    namespace: Dict[str, Any],
+    index: int,
+    schema_key: str,
+    schema_value: Any,
+) -> List[str]:
+    """
+    Generate the source that validates a present value that is not a nested
+    object or list matching the schema.
+
+    Args:
+        namespace (Dict[str, Any]):
+            Globals of the validator, where the objects it refers to are stored.
+        index (int):
+            Position of the key in its schema, used to name those objects.
+        schema_key (str):
+            Key in the JVAL schema.
+        schema_value (Any):
+            Value for the key in the JVAL schema.
+
+    Returns:
+        Lines of source, without indentation.
+    """
+    key = repr(get_clean_key(schema_key))
+    context = f"(*__context, {key})"
+    category = _classify_key(schema_key)
+
+    # Spec key starts with an asterisk (type definition)
+    if category == KEY_TYPED:
+        if not isinstance(schema_value, str):
+            return []
+        return _codegen_type(namespace, index, schema_key, schema_value)
+
+    # Spec key defines the type of an optional value
+    if category == KEY_OPTIONAL_TYPED:
+        if _is_type_definition(schema_value):
+            return _codegen_type(namespace, index, schema_key, schema_value)
+
+        # Lists and dicts that did not match the actual value are left to the
+        # slow path, which reports them exactly as it always did
+        if type(schema_value) is list:
+            return [
+                f"_validate_list({schema_key!r}, [value_{index}], actual_value,"
+                f" {context}, drop_extra_keys=drop_extra_keys)"
+            ]
+        if type(schema_value) is dict:
+            return [
+                f"_validate(actual_value, value_{index}, {context},"
+                " drop_extra_keys=drop_extra_keys)"
+            ]
+
+    # Spec key defines the type of an optional value implicitly by its default
+    elif category == KEY_OPTIONAL_DEFAULT:
+        return _codegen_type(
+            namespace,
+            index,
+            schema_key,
+            f"{SYMBOL_TYPE_START}{type(schema_value).__name__}{SYMBOL_TYPE_END}",
+        )
+
+    # Spec key is a literal value
+    message = repr(f"expected literal '{schema_value}'")
+    return [
+        f"if actual_value != value_{index}:",
+        f"    raise ValidationError({key}, {message}, {context})",
+    ]
+
+
+def _codegen_type(
+    namespace: Dict[str, Any],
+    index: int,
+    schema_key: str,
+    schema_value: str,
+) -> List[str]:
+    key = repr(get_clean_key(schema_key))
+    context = f"(*__context, {key})"
+
+    expected_type, _ = _parse_type(schema_value)
+
+    # Unknown types are reported by the slow path
+    if expected_type is None:
+        return [
+            f"_validate_type({schema_key!r}, {schema_value!r}, actual_value,"
+            f" {context})"
+        ]
+
+    namespace[f"type_{index}"] = expected_type
+    message = repr(f"expected type {schema_value}")
+    return [
+        f"if not isinstance(actual_value, type_{index}):",
+        f"    raise ValidationError({key}, {message}, {context})",
+    ]
+
+
+def _codegen_list(
+    namespace: Dict[str, Any],
+    index: int,
+    schema_key: str,
+    schema_values: List[Any],
+) -> List[str]:
+    key = repr(get_clean_key(schema_key))
+    namespace[f"validate_{index}"] = _compile_list(schema_key, schema_values)
+    return [f"validate_{index}(actual_value, (*__context, {key}), drop_extra_keys)"]
+
+
+def _compile_list(key: str, schema_values: List[Any]) -> Callable[..., None]:
+    clean_key = get_clean_key(key)
+    first = schema_values[0] if schema_values else None
+
+    def check_slow(actual_values, current_context, drop_extra_keys):
+        _validate_list(
+            key,
+            schema_values,
+            actual_values,
+            current_context,
+            drop_extra_keys=drop_extra_keys,
+        )
+
     # List of literals
-    if isinstance(schema_values[0], (str, float, int)):
+    if isinstance(first, (str, float, int)):
 
         # Literal represents a type definition
-        if (
-            key.startswith(f"{SYMBOL_TYPED}")
-            and isinstance(schema_values[0], str)
-            and schema_values[0].startswith(f"{SYMBOL_TYPE_START}")
-            and schema_values[0].endswith(f"{SYMBOL_TYPE_END}")
-        ):
-            for index, actual_value in enumerate(actual_values):
-                new_context = f"{current_context}[{index}]"
-                _validate_type(key, schema_values[0], actual_value, new_context)
+        if _classify_key(key) == KEY_TYPED and _is_type_definition(first):
+            expected_type, _ = _parse_type(first)
+
+            def check_typed_list(actual_values, current_context, _drop_extra_keys):
+                if expected_type is not None and _all_of_type(
+                    actual_values, expected_type
+                ):
+                    return
+                for index, actual_value in enumerate(actual_values):
+                    if expected_type is None:
+                        raise ValidationError(
+                            clean_key,
+                            f"unknown type {first} in schema",
+                            (*current_context, index),
+                        )
+                    if not isinstance(actual_value, expected_type):
+                        raise ValidationError(
+                            clean_key,
+                            f"expected type {first}",
+                            (*current_context, index),
+                        )
+
+            return check_typed_list
 
         # Literal represents a literal value
-        else:
-            if len(actual_values) != len(schema_values):
-                raise_error(get_clean_key(key), "list length mismatch", current_context)
+        length = len(schema_values)
+
+        # Lists are compared as a whole, and element by element only to locate
+        # a mismatch
+        def check_literal_list(actual_values, current_context, _drop_extra_keys):
+            if len(actual_values) != length:
+                raise ValidationError(
+                    clean_key, "list length mismatch", current_context
+                )
+            if actual_values == schema_values:
+                return
             for index, (actual_value, schema_value) in enumerate(
                 zip(actual_values, schema_values)
             ):
-                new_context = f"{current_context}[{index}]"
-                _validate_literal(key, schema_value, actual_value, new_context)
+                if actual_value != schema_value:
+                    raise ValidationError(
+                        clean_key,
+                        f"expected literal '{schema_value}'",
+                        (*current_context, index),
+                    )
+
+        return check_literal_list
 
     # List of dicts
-    elif isinstance(schema_values[0], dict):
-        for index, actual_value in enumerate(actual_values):
-            new_context = f"{current_context}[{index}]"
-            for schema in schema_values:
-                _validate(
+    if type(first) is dict:
+        if not all(type(schema) is dict for schema in schema_values):
+            return check_slow
+        validators = [compile_schema(schema) for schema in schema_values]
+
+        # Every element must match every schema, checked one schema at a time
+        def check_dict_list(actual_values, current_context, drop_extra_keys):
+            for validator in validators:
+                for index, actual_value in enumerate(actual_values):
+                    validator(
+                        actual_value,
+                        (*current_context, index),
+                        drop_extra_keys=drop_extra_keys,
+                    )
+
+        return check_dict_list
+
+    # List of lists
+    if type(first) is list:
+        validate_inner = _compile_list(key, first)
+
+        def check_nested_list(actual_values, current_context, drop_extra_keys):
+            for index, actual_value in enumerate(actual_values):
+                validate_inner(
                     actual_value,
-                    schema,
-                    new_context,
-                    drop_extra_keys=drop_extra_keys,
+                    (*current_context, index),
+                    drop_extra_keys,
                 )
 
-    # List of lists
-    elif isinstance(schema_values[0], list):
-        for index, actual_value in enumerate(actual_values):
-            new_context = f"{current_context}[{index}]"
-            _validate_list(
-                key,
-                schema_values[0],
-                actual_value,
-                new_context,
-                drop_extra_keys,
+        return check_nested_list
+
+    # Empty lists are left to the slow path, anything else is not validated
+    return check_slow if not schema_values else _skip
+
+
+def _all_of_type(values: Any, expected_type: type) -> bool:
+    """
+    Check whether every value is an instance of the expected type.
+
+    The check runs in a single C-level pass over the values, so typed lists
+    only fall back to an element by element loop to locate the first element
+    that fails.
+
+    Args:
+        values (Any):
+            Values to check.
+        expected_type (type):
+            Type every value must be an instance of.
+
+    Returns:
+        True if every value is an instance of the expected type.
+    """
+    return all(map(expected_type.__instancecheck__, values))
+
+
+def _empty_to_none(schema_value: Any) -> Any:
+    """
+    Treat empty objects and lists in the schema as null.
+    """
+    if type(schema_value) in (dict, list) and not schema_value:
+        return None
+    return schema_value
+
+
+def _schema_depth(jval_schema: Any) -> int:
+    """
+    Get how deeply objects and lists are nested in a JVAL schema.
+    """
+    depth = 0
+    stack = [(jval_schema, 1)]
+    while stack:
+        node, node_depth = stack.pop()
+        if type(node) is dict:
+            depth = max(depth, node_depth)
+            stack.extend((value, node_depth + 1) for value in node.values())
+        elif type(node) is list:
+            depth = max(depth, node_depth)
+            stack.extend((value, node_depth + 1) for value in node)
+    return depth
+
+
+def warn_multiple_object_schemas(jval_schema: Any, stacklevel: int = 1):
+    """
+    Warn about every list in a JVAL schema that defines more than one object,
+    since every element of such a list is validated against all of them.
+
+    Args:
+        jval_schema (Any):
+            JVAL schema to check.
+        stacklevel (int, optional):
+            Stack level of the warnings, counted from the caller of this function.
+            Defaults to 1.
+    """
+    stack = [(jval_schema, None)]
+    while stack:
+        node, clean_key = stack.pop()
+        if type(node) is dict:
+            # Keys that are not strings are reported when validating
+            stack.extend(
+                (value, get_clean_key(key) if isinstance(key, str) else key)
+                for key, value in reversed(node.items())
             )
+        elif type(node) is list:
+            if len(node) > 1 and type(node[0]) is dict:
+                warnings.warn(
+                    f"The list for key '{clean_key}' defines {len(node)}"
+                    " objects in the schema. Every element of the list will be"
+                    " validated against all of them, not against any of them.",
+                    stacklevel=stacklevel + 1,
+                )
+            stack.extend((value, clean_key) for value in reversed(node))
+
+
+def _skip(*_args):
+    pass
 
 
 def raise_if_invalid_json(json_dict, name):
@@ -295,31 +832,40 @@ def raise_if_invalid_json(json_dict, name):
     """
     must_be_json_object = f"'{name}' must be a valid JSON object."
 
-    def validate_json(data, path="") -> Union[bool, str]:
-        if isinstance(data, dict):
-            for k, v in data.items():
-                if not isinstance(k, str):
-                    location = f"{path}.{k}" if path else k
-                    return (
-                        f"Invalid type for key '{location}':"
-                        f" All keys must be strings, got {type(k).__name__}"
-                    )
-                result = validate_json(v, f"{path}.{k}" if path else k)
-                if result is not True:
-                    return result
-        elif isinstance(data, list):
-            for index, item in enumerate(data):
-                result = validate_json(item, f"{path}[{index}]")
-                if result is not True:
-                    return result
-        elif isinstance(data, (int, float, str, bool, type(None))):
-            return True
-        else:
-            return (
-                f"Invalid type for value of key '{path}':"
-                f" All values must be one of (int, float, str, bool, None, JsonDict, JsonList),"
-                f" got {type(data).__name__}"
-            )
+    def validate_json(root) -> Union[bool, str]:
+
+        # Nodes are visited depth-first, in the order they appear, using an
+        # explicit stack so that deeply nested objects cannot exhaust the
+        # interpreter's recursion limit. Each entry carries the key that led
+        # to it, which is checked when the entry is visited.
+        stack = [(root, "", "")]
+        while stack:
+            data, path, key = stack.pop()
+            if not isinstance(key, str):
+                return (
+                    f"Invalid type for key '{path}':"
+                    f" All keys must be strings, got {type(key).__name__}"
+                )
+
+            data_type = type(data)
+            if data_type in JSON_LEAF_TYPES:
+                continue
+            if data_type is dict or isinstance(data, dict):
+                stack.extend(
+                    (v, f"{path}.{k}" if path else k, k)
+                    for k, v in reversed(data.items())
+                )
+            elif data_type is list or isinstance(data, list):
+                stack.extend(
+                    (data[index], f"{path}[{index}]", "")
+                    for index in range(len(data) - 1, -1, -1)
+                )
+            elif not isinstance(data, JSON_LEAF_TYPES):
+                return (
+                    f"Invalid type for value of key '{path}':"
+                    f" All values must be one of (int, float, str, bool, None, JsonDict, JsonList),"
+                    f" got {type(data).__name__}"
+                )
 
         return True
 
@@ -331,6 +877,7 @@ def raise_if_invalid_json(json_dict, name):
         raise ValueError(f"Errors in {name}: {errors}")
 
 
+@functools.lru_cache(maxsize=4096)
 def get_clean_key(key: str) -> str:
     """
     Removes all special characters from the key.
@@ -343,3 +890,54 @@ def get_clean_key(key: str) -> str:
         Cleaned key.
     """
     return key.lstrip(f"{SYMBOL_OPTIONAL}{SYMBOL_TYPED}{SYMBOL_DEFAULT}")
+
+
+@functools.lru_cache(maxsize=4096)
+def _classify_key(key: str) -> int:
+    """
+    Classifies a schema key by its special characters.
+
+    Args:
+        key (str):
+            Key to classify.
+
+    Returns:
+        One of the KEY_* categories.
+    """
+    if key.startswith(f"{SYMBOL_OPTIONAL}{SYMBOL_TYPED}"):
+        return KEY_OPTIONAL_TYPED
+    if key.startswith(f"{SYMBOL_OPTIONAL}{SYMBOL_DEFAULT}"):
+        return KEY_OPTIONAL_DEFAULT
+    if key.startswith(f"{SYMBOL_OPTIONAL}"):
+        return KEY_OPTIONAL
+    if key.startswith(f"{SYMBOL_TYPED}"):
+        return KEY_TYPED
+    return KEY_LITERAL
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_type(schema_value: str) -> Tuple[Optional[type], bool]:
+    """
+    Parses a type definition such as "<int>".
+
+    Args:
+        schema_value (str):
+            Value to parse.
+
+    Returns:
+        The Python type it names, or None if it names no known type, and
+        whether the value is enclosed in the type enclosing characters.
+    """
+    is_type_definition = schema_value.startswith(
+        f"{SYMBOL_TYPE_START}"
+    ) and schema_value.endswith(f"{SYMBOL_TYPE_END}")
+    if not is_type_definition:
+        return None, False
+    return TYPE_DICT.get(schema_value), True
+
+
+def _is_type_definition(schema_value: Any) -> bool:
+    # Known types are found with a single lookup, without parsing the value
+    return isinstance(schema_value, str) and (
+        schema_value in TYPE_DICT or _parse_type(schema_value)[1]
+    )
@@ -2,11 +2,19 @@
 Test cases for JSON Validation using JVAL schema.
 """
 
+import contextlib
+import io
 import json
+import sys
+import tempfile
+import threading
 import unittest
+import warnings
 from pathlib import Path
 from typing import Any, Dict, Union
-from jval import validate
+from unittest import mock
+from jval import ValidationError, compile_validator, validate, validate_many
+from jval.__main__ import COMPILED_SCHEMAS_MAX_SIZE, _COMPILED_SCHEMAS, main
 
 
 def read_test_cases(test_folder):
@@ -132,6 +140,257 @@ class TestJSONValidation(unittest.TestCase):
             setattr(cls, test_method.__name__, test_method)
 
 
+class TestCompiledSchemas(unittest.TestCase):
+    """
+    Test class for the reuse of compiled JVAL schemas.
+    """
+
+    def test_schema_modified_after_validation(self):
+        """A schema modified in place must not reuse its old compiled form."""
+        schema = {"*name": "<str>"}
+        self.assertEqual(validate({"name": "Alice"}, schema), {"name": "Alice"})
+
+        schema["*name"] = "<int>"
+        with self.assertRaises(ValueError) as ctx:
+            validate({"name": "Alice"}, schema)
+        self.assertEqual(
+            str(ctx.exception),
+            "Validation error at 'name': expected type <int> for key 'name'",
+        )
+
+    def test_schema_modified_to_equal_value_of_other_type(self):
+        """Values equal to the old ones but of another type must be noticed."""
+        schema = {"?_flag": 1}
+        self.assertEqual(validate({}, schema), {"flag": 1})
+        schema["?_flag"] = True
+        self.assertEqual(validate({}, schema), {"flag": True})
+
+        schema = {"?_ratio": 1}
+        self.assertEqual(validate({"ratio": 2}, schema), {"ratio": 2})
+        schema["?_ratio"] = 1.0
+        with self.assertRaises(ValueError) as ctx:
+            validate({"ratio": 2}, schema)
+        self.assertEqual(
+            str(ctx.exception),
+            "Validation error at 'ratio': expected type <float> for key 'ratio'",
+        )
+
+    def test_schema_that_cannot_be_copied(self):
+        """Schemas that cannot be cached must still raise library errors."""
+        schema = {"lock": threading.Lock()}
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                validate({"lock": 1}, schema)
+
+    def test_schema_with_key_that_is_not_a_string(self):
+        """Invalid schema keys must be reported as invalid JSON."""
+        with self.assertRaises(ValueError) as ctx:
+            validate({}, {1: "x"})
+        self.assertEqual(
+            str(ctx.exception),
+            "Errors in jval_schema: Invalid type for key '1':"
+            " All keys must be strings, got int",
+        )
+
+    def test_validation_error_arguments(self):
+        """Validation errors must keep the formatted message as their argument."""
+        with self.assertRaises(ValidationError) as ctx:
+            validate({"name": 1}, {"*name": "<str>"})
+        message = "Validation error at 'name': expected type <str> for key 'name'"
+        self.assertEqual(ctx.exception.args, (message,))
+        self.assertEqual(
+            (ctx.exception.key, ctx.exception.message, ctx.exception.context),
+            ("name", "expected type <str>", ("name",)),
+        )
+
+    def test_value_that_is_not_an_object(self):
+        """Values checked against an empty object schema must not crash."""
+        schema = {"?*cars": [{}]}
+        with self.assertRaises(ValidationError) as ctx:
+            validate({"cars": "x"}, schema)
+        self.assertEqual(
+            str(ctx.exception),
+            "Validation error at 'cars[0][0]': extra key not defined in schema"
+            " for key 'x'",
+        )
+
+    def test_equal_schemas_validate_independently(self):
+        """Distinct schema objects must each produce their own results."""
+        first = {"?_role": "user"}
+        second = {"?_role": "admin"}
+        self.assertEqual(validate({}, first), {"role": "user"})
+        self.assertEqual(validate({}, second), {"role": "admin"})
+        self.assertEqual(validate({}, first), {"role": "user"})
+
+    def test_schema_with_nan_is_compiled_once(self):
+        """Schemas with NaN values must reuse their compiled form."""
+        schema = json.loads('{"?_ratio": NaN, "*name": "<str>"}')
+        validate({"name": "Alice"}, schema)
+        compiled = _COMPILED_SCHEMAS[id(schema)]
+        validate({"name": "Bob"}, schema)
+        self.assertIs(_COMPILED_SCHEMAS[id(schema)], compiled)
+
+    def test_compile_validator(self):
+        """Compiled validators must behave like validate."""
+        validate_person = compile_validator({"*name": "<str>", "?_age": 0})
+        self.assertEqual(
+            validate_person({"name": "Alice"}), {"name": "Alice", "age": 0}
+        )
+        self.assertEqual(
+            validate_person({"name": "Bob", "pet": "cat"}, drop_extra_keys=True),
+            {"name": "Bob", "age": 0},
+        )
+        with self.assertRaises(ValueError) as ctx:
+            validate_person({"name": 1})
+        self.assertEqual(
+            str(ctx.exception),
+            "Validation error at 'name': expected type <str> for key 'name'",
+        )
+
+    def test_compiled_schemas_are_bounded(self):
+        """Only a limited number of compiled schemas must be kept."""
+        for index in range(COMPILED_SCHEMAS_MAX_SIZE * 2):
+            schema = {"*name": "<str>", f"?_index_{index}": index}
+            self.assertEqual(
+                validate({"name": "Alice"}, schema),
+                {"name": "Alice", f"index_{index}": index},
+            )
+        self.assertLessEqual(len(_COMPILED_SCHEMAS), COMPILED_SCHEMAS_MAX_SIZE)
+
+    def test_list_with_several_object_schemas_warns(self):
+        """Lists that define more than one object schema must warn."""
+        schema = {"*cars": [{"*brand": "<str>"}, {"?*brand": "<str>"}]}
+        with self.assertWarns(UserWarning) as ctx:
+            validated = validate({"cars": [{"brand": "Toyota"}]}, schema)
+        self.assertEqual(validated, {"cars": [{"brand": "Toyota"}]})
+        self.assertEqual(ctx.filename, __file__)
+
+    def test_several_object_schemas_warning_as_error(self):
+        """Warnings turned into errors must be raised, not silently ignored."""
+        schema = {"*cars": [{"?brand": "Ford"}, {"?model": "T"}]}
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            with self.assertRaises(UserWarning):
+                validate({"cars": [{}]}, schema)
+
+    def test_deeply_nested_several_object_schemas_warns(self):
+        """Schemas validated without compiling them must warn as well."""
+        schema = {"*cars": [{"*brand": "<str>"}, {"?*brand": "<str>"}]}
+        data = {"cars": []}
+        for _ in range(150):
+            schema = {"garage": schema}
+            data = {"garage": data}
+        with self.assertWarns(UserWarning):
+            validate(data, schema)
+
+    def test_drop_extra_keys_leaves_root_untouched(self):
+        """Extra keys must be dropped from the output, not from the root input."""
+        schema = {"*name": "<str>", "pet": {"*kind": "<str>"}}
+        data = {"name": "Alice", "age": 30, "pet": {"kind": "cat", "age": 3}}
+        validated = validate(data, schema, drop_extra_keys=True)
+        self.assertEqual(validated, {"name": "Alice", "pet": {"kind": "cat"}})
+        self.assertEqual(data, {"name": "Alice", "age": 30, "pet": {"kind": "cat"}})
+
+    def test_deeply_nested_schema(self):
+        """Schemas nested beyond the recursion limit must still validate."""
+        schema = {"*name": "<str>"}
+        data = {"name": 1}
+        for _ in range(600):
+            schema = {"items": [schema], "?_count": 0}
+            data = {"items": [data]}
+
+        with self.assertRaises(ValueError) as ctx:
+            validate(data, schema)
+        self.assertEqual(
+            str(ctx.exception),
+            "Validation error at '"
+            + "items[0]." * 600
+            + "name': expected type <str> for key 'name'",
+        )
+
+
+class TestValidateMany(unittest.TestCase):
+    """
+    Test class for validating several JSON documents at once.
+    """
+
+    schema = {"*name": "<str>", "?_role": "user"}
+
+    def test_documents_are_validated_in_order(self):
+        """Each document must be validated, in the order they were given."""
+        docs = [{"name": "Alice"}, {"name": "Bob", "role": "admin"}]
+        expected = [{"name": "Alice", "role": "user"}, {"name": "Bob", "role": "admin"}]
+        self.assertEqual(validate_many(docs, self.schema), expected)
+        self.assertEqual(validate_many(docs, self.schema, workers=2), expected)
+
+    def test_first_invalid_document_raises(self):
+        """The error of the first invalid document must be raised."""
+        docs = [{"name": "Alice"}, {"name": 1}, {}] * 100
+        for workers in (None, 2):
+            with self.assertRaises(ValueError) as ctx:
+                validate_many(docs, self.schema, workers=workers)
+            self.assertEqual(
+                str(ctx.exception),
+                "Validation error at 'name': expected type <str> for key 'name'",
+            )
+
+
+class TestCommandLine(unittest.TestCase):
+    """
+    Test class for the command-line interface.
+    """
+
+    def run_main(self, *args):
+        """Run the CLI with the given arguments, returning its exit code and output."""
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with mock.patch.object(
+            sys, "argv", ["jval", *args]
+        ), contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            with self.assertRaises(SystemExit) as ctx:
+                main()
+        return ctx.exception.code, stdout.getvalue(), stderr.getvalue()
+
+    def write_file(self, content):
+        """Write a temporary file that is removed after the test."""
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".json", delete=False, encoding="utf-8"
+        ) as file:
+            file.write(content)
+        self.addCleanup(Path(file.name).unlink)
+        return file.name
+
+    def test_validate_file(self):
+        """A JSON file must be validated and printed."""
+        code, stdout, _ = self.run_main(
+            "tests/all_null/all_null.json", "tests/all_null/all_null.jval.json"
+        )
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(stdout), {"role": None})
+
+    def test_batch(self):
+        """Every line of a NDJSON file must be validated and printed."""
+        schema = self.write_file('{"*name": "<str>", "?_role": "user"}')
+        ndjson = self.write_file('{"name": "Alice"}\n\n{"name": "Bob", "pet": 1}\n')
+        code, stdout, _ = self.run_main("--batch", "--drop-extra-keys", ndjson, schema)
+        self.assertEqual(code, 0)
+        self.assertEqual(
+            [json.loads(line) for line in stdout.splitlines()],
+            [{"name": "Alice", "role": "user"}, {"name": "Bob", "role": "user"}],
+        )
+
+    def test_batch_error_reports_line(self):
+        """Errors in NDJSON files must report the line that failed."""
+        schema = self.write_file('{"*name": "<str>"}')
+        ndjson = self.write_file('{"name": "Alice"}\n\n{"name": 1}\n')
+        code, stdout, stderr = self.run_main("--batch", ndjson, schema)
+        self.assertEqual(code, 1)
+        self.assertEqual(stdout, "")
+        self.assertEqual(
+            stderr.strip(),
+            "Line 3: Validation error at 'name': expected type <str> for key 'name'",
+        )
+
+
 # Generate tests
 TestJSONValidation.generate_tests()
 